@@ -46,11 +46,14 @@ setuptools.setup(
     url='https://github.com/Yuan-ManX/SoundHub',
     license='MIT',
     packages=setuptools.find_packages(),
+    python_requires='>=3.9',
     long_description=__doc__,
     install_requires=[
         'transformers',
         'pydub',
         'msclap',
+        'torch',
+        'numpy',
     ],
     classifiers=[
         'Development Status :: 3 - Alpha',
@@ -60,9 +63,6 @@ setuptools.setup(
         'Topic :: Scientific/Engineering :: Artificial Intelligence',
         'Topic :: Multimedia :: Sound/Audio :: Analysis',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
-        'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
         'Programming Language :: Python :: 3.10',
         'Programming Language :: Python :: 3.11',
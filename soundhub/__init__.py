@@ -27,6 +27,7 @@
 from soundhub import audio
 from soundhub import asr
 from soundhub import caption
+from soundhub import models
 from soundhub import retrieve
 
 # Version number.
@@ -21,7 +21,212 @@
 # SOFTWARE.
 
 
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import subprocess
+import wave
+
+import numpy as np
 from pydub import AudioSegment
+from pydub.utils import get_prober_name
+
+# NumPy sample types for the sample widths pydub uses internally (24-bit audio is widened to 32-bit on load)
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+# Bit depths of the ffmpeg sample formats, used when ffprobe does not report bits per sample
+_SAMPLE_FORMAT_BITS = {'u8': 8, 's16': 16, 's32': 32, 'flt': 32, 's64': 64, 'dbl': 64}
+
+# Lossy codecs whose planar float samples pydub decodes as 16-bit PCM
+_LOSSY_CODECS = {'mp3', 'mp4', 'aac', 'webm', 'ogg', 'vorbis', 'opus'}
+
+
+def _load_segments(audio_paths):
+    """
+    Load multiple audio files into AudioSegment objects in parallel.
+
+    Each file is decoded by its own ffmpeg subprocess, so threads are enough to overlap the decodes.
+
+    Parameters:
+    - audio_paths (list of str): A list of paths to the audio files to be loaded.
+
+    Returns:
+    - list of AudioSegment: The loaded audio segments, in the same order as audio_paths.
+    """
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(AudioSegment.from_file, audio_paths))
+
+
+def _iter_segments(audio_paths):
+    """
+    Lazily load audio files into AudioSegment objects, decoding a few files ahead in parallel.
+
+    At most one file per CPU is decoded ahead of the consumer, so memory stays bounded regardless of the number of files.
+
+    Parameters:
+    - audio_paths (list of str): A list of paths to the audio files to be loaded.
+
+    Yields:
+    - AudioSegment: The loaded audio segments, in the same order as audio_paths.
+    """
+    max_workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers) as executor:
+        pending = deque()
+        for path in audio_paths:
+            pending.append(executor.submit(AudioSegment.from_file, path))
+            if len(pending) >= max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _wav_frames(segment):
+    """
+    Get the sample data of an AudioSegment as it is stored in a WAV file.
+
+    pydub keeps 8-bit audio as signed samples internally, while 8-bit WAV samples are unsigned, so they are shifted by 128.
+
+    Parameters:
+    - segment (AudioSegment): The audio segment to be written.
+
+    Returns:
+    - bytes: The WAV frame data of the segment.
+    """
+    if segment.sample_width == 1:
+        return (np.frombuffer(segment.raw_data, dtype=np.uint8) ^ 0x80).tobytes()
+    return segment.raw_data
+
+
+def _run_ffmpeg(*args):
+    """
+    Run the ffmpeg binary configured for pydub with the given arguments.
+
+    Parameters:
+    - *args (str): The command-line arguments passed to ffmpeg.
+
+    Returns:
+    - None
+
+    Raises:
+    - subprocess.CalledProcessError: If ffmpeg exits with a non-zero status.
+    """
+    subprocess.run([AudioSegment.converter, '-v', 'quiet', '-y', *args], check=True)
+
+
+def _probe_audio_stream(audio_path):
+    """
+    Read the headers of the first audio stream of a file with ffprobe, without decoding the audio.
+
+    Parameters:
+    - audio_path (str): The path to the audio file to be probed.
+
+    Returns:
+    - stream (dict): The ffprobe description of the first audio stream.
+    - container (dict): The ffprobe description of the container format.
+
+    Raises:
+    - subprocess.CalledProcessError: If ffprobe exits with a non-zero status.
+    """
+    output = subprocess.check_output([
+        get_prober_name(), '-v', 'quiet', '-print_format', 'json',
+        '-show_streams', '-show_format', '-select_streams', 'a:0', audio_path,
+    ])
+    info = json.loads(output)
+    return info['streams'][0], info['format']
+
+
+def _stream_bit_depth(stream):
+    """
+    Get the bit depth of an audio stream described by ffprobe.
+
+    Parameters:
+    - stream (dict): The ffprobe description of the audio stream.
+
+    Returns:
+    - int: The bit depth of the audio, or None if ffprobe does not report it.
+    """
+    # Follow pydub, which decodes lossy codecs with float samples as 16-bit audio
+    if stream.get('sample_fmt') == 'fltp' and stream.get('codec_name') in _LOSSY_CODECS:
+        return 16
+    return (
+        int(stream.get('bits_per_sample') or 0)
+        or int(stream.get('bits_per_raw_sample') or 0)
+        or _SAMPLE_FORMAT_BITS.get(stream.get('sample_fmt', '').rstrip('p'))
+    )
+
+
+def _pydub_sample_width(bit_depth):
+    """
+    Get the sample width pydub uses in memory for audio of the given bit depth.
+
+    Parameters:
+    - bit_depth (int): The bit depth of the source audio, or None if unknown.
+
+    Returns:
+    - int: The sample width in bytes, with 24-bit audio widened to 32-bit as pydub does on load.
+    """
+    if bit_depth is None:
+        return 2
+    if bit_depth <= 8:
+        return 1
+    if bit_depth <= 16:
+        return 2
+    return 4
+
+
+def _pcm_codec(bit_depth):
+    """
+    Choose the ffmpeg PCM codec that keeps the bit depth of the source audio, as pydub does when decoding.
+
+    Parameters:
+    - bit_depth (int): The bit depth of the source audio, or None if unknown.
+
+    Returns:
+    - str: The name of the ffmpeg PCM codec.
+    """
+    if bit_depth == 8:
+        return 'pcm_u8'
+    if bit_depth == 24:
+        return 'pcm_s24le'
+    if bit_depth is not None and bit_depth > 16:
+        return 'pcm_s32le'
+    return 'pcm_s16le'
+
+
+def _trim_wav(audio_path, output_path, start_time, end_time):
+    """
+    Trim a PCM WAV file by copying the requested frames, without decoding or re-encoding the audio.
+
+    Parameters:
+    - audio_path (str): The path to the PCM WAV file to be trimmed.
+    - output_path (str): The path where the trimmed audio file will be saved.
+    - start_time (int): The start time in milliseconds from where to start trimming.
+    - end_time (int, optional): The end time in milliseconds where to end trimming. If None, the audio is kept until its end.
+
+    Returns:
+    - None: The trimmed audio is saved to the specified output path.
+
+    Raises:
+    - wave.Error: If the file is not a PCM WAV file the wave module can read.
+    """
+    with wave.open(audio_path, 'rb') as source:
+        frame_rate = source.getframerate()
+        n_frames = source.getnframes()
+        
+        # Convert the times to frame positions, clamped to the length of the audio
+        start_frame = min(int(start_time * frame_rate / 1000), n_frames)
+        end_frame = n_frames if end_time is None else min(int(end_time * frame_rate / 1000), n_frames)
+        
+        source.setpos(start_frame)
+        frames = source.readframes(max(end_frame - start_frame, 0))
+        params = source.getparams()
+    
+    with wave.open(output_path, 'wb') as output:
+        output.setparams(params)
+        output.writeframes(frames)
+
 
 def trim(audio_path, output_path, trim_length=None, start_time=0, end_time=None):
     """
@@ -37,22 +242,32 @@ def trim(audio_path, output_path, trim_length=None, start_time=0, end_time=None)
     Returns:
     - None: The trimmed audio is saved to the specified output path.
     """
-    audio = AudioSegment.from_file(audio_path)
-    
     # If trim_length is specified, use it to calculate end_time
     if trim_length is not None:
         end_time = start_time + trim_length
     
-    # If end_time is not specified, use the duration of the audio
-    if end_time is None:
-        end_time = len(audio)
+    # PCM WAV files are trimmed by copying frames directly
+    if audio_path.lower().endswith('.wav'):
+        try:
+            _trim_wav(audio_path, output_path, start_time, end_time)
+            return
+        except (wave.Error, EOFError):
+            # Not a PCM WAV the wave module can read, fall back to ffmpeg
+            pass
+    
+    # Seek before opening the input so ffmpeg only decodes the requested window
+    args = ['-ss', f'{start_time / 1000}']
     
-    # Ensure end_time does not exceed the duration of the audio
-    end_time = min(end_time, len(audio))
+    # If end_time is not specified, ffmpeg reads until the end of the audio
+    if end_time is not None:
+        args += ['-t', f'{max(end_time - start_time, 0) / 1000}']
+    
+    # Keep the bit depth of the source, as ffmpeg otherwise writes 16-bit WAV
+    stream, _ = _probe_audio_stream(audio_path)
+    codec = _pcm_codec(_stream_bit_depth(stream))
     
     # Trim the audio and export it to the specified output path
-    trimmed_audio = audio[start_time:end_time]
-    trimmed_audio.export(output_path, format="wav")
+    _run_ffmpeg(*args, '-i', audio_path, '-c:a', codec, '-f', 'wav', output_path)
 
 
 def concat(audio_paths, output_path):
@@ -65,15 +280,32 @@ def concat(audio_paths, output_path):
 
     Returns:
     - None: The concatenated audio is saved to the specified output path.
+
+    Raises:
+    - ValueError: If audio_paths is empty.
     """
-    # Load each audio file into an AudioSegment object
-    audio_segments = [AudioSegment.from_file(path) for path in audio_paths]
-    
-    # Concatenate all audio segments into a single AudioSegment object
-    concatenated_audio = sum(audio_segments)
+    if not audio_paths:
+        raise ValueError("At least one audio file is required for concatenation.")
+
+    # Read every header up front to pick the output format, as pydub does when appending segments
+    with ThreadPoolExecutor() as executor:
+        streams = [stream for stream, _ in executor.map(_probe_audio_stream, audio_paths)]
+    frame_rate = max(int(stream['sample_rate']) for stream in streams)
+    channels = max(int(stream['channels']) for stream in streams)
+    sample_width = max(_pydub_sample_width(_stream_bit_depth(stream)) for stream in streams)
     
-    # Export the concatenated audio to the specified output path
-    concatenated_audio.export(output_path, format="wav")
+    # Stream each segment to the output file, decoding lazily so only a few segments are held in memory at a time
+    with wave.open(output_path, 'wb') as output:
+        output.setnchannels(channels)
+        output.setsampwidth(sample_width)
+        output.setframerate(frame_rate)
+        
+        for segment in _iter_segments(audio_paths):
+            # Convert each segment up to the highest frame rate, channel count and sample width of all inputs
+            segment = segment.set_channels(channels)
+            segment = segment.set_frame_rate(frame_rate)
+            segment = segment.set_sample_width(sample_width)
+            output.writeframesraw(_wav_frames(segment))
 
 
 def fade(audio_path, output_path, fade_in_duration=0, fade_out_duration=0):
@@ -92,13 +324,22 @@ def fade(audio_path, output_path, fade_in_duration=0, fade_out_duration=0):
     # Load the audio file into an AudioSegment object
     audio = AudioSegment.from_file(audio_path)
     
-    # Apply fade-in effect if fade_in_duration is greater than 0
+    # Copy the samples once into a writable (frames, channels) array
+    samples = np.frombuffer(audio.raw_data, dtype=_SAMPLE_DTYPES[audio.sample_width]).reshape(-1, audio.channels).copy()
+    n_frames = len(samples)
+    
+    # Apply fade-in effect if fade_in_duration is greater than 0, scaling only the faded frames in place
     if fade_in_duration > 0:
-        audio = audio.fade_in(fade_in_duration)
+        fade_in_frames = min(int(fade_in_duration * audio.frame_rate / 1000), n_frames)
+        samples[:fade_in_frames] = samples[:fade_in_frames] * np.linspace(0.0, 1.0, fade_in_frames)[:, None]
     
-    # Apply fade-out effect if fade_out_duration is greater than 0
+    # Apply fade-out effect if fade_out_duration is greater than 0, scaling only the faded frames in place
     if fade_out_duration > 0:
-        audio = audio.fade_out(fade_out_duration)
+        fade_out_frames = min(int(fade_out_duration * audio.frame_rate / 1000), n_frames)
+        fade_out_start = n_frames - fade_out_frames
+        samples[fade_out_start:] = samples[fade_out_start:] * np.linspace(1.0, 0.0, fade_out_frames)[:, None]
+    
+    audio = audio._spawn(samples.tobytes())
     
     # Export the audio with fade effects to the specified output path
     audio.export(output_path, format="wav")
@@ -122,14 +363,18 @@ def metadata(audio_path):
     - Exception: If an error occurs while reading the audio file.
     """
     try:
-        # Load the audio file into an AudioSegment object
-        audio = AudioSegment.from_file(audio_path)
+        # Check the input up front, as ffprobe only reports a generic failure
+        if not os.path.isfile(audio_path):
+            raise FileNotFoundError(audio_path)
+
+        # Read the stream headers with ffprobe instead of decoding the audio
+        stream, container = _probe_audio_stream(audio_path)
         
         # Extract metadata
-        frame_rate = audio.frame_rate
-        channels = audio.channels
-        duration_seconds = audio.duration_seconds
-        bit_depth = audio.sample_width * 8 
+        frame_rate = int(stream['sample_rate'])
+        channels = int(stream['channels'])
+        duration_seconds = float(stream.get('duration') or container['duration'])
+        bit_depth = _stream_bit_depth(stream)
         
         # Return the metadata
         return frame_rate, channels, duration_seconds, bit_depth
@@ -186,14 +431,26 @@ def mix(audio_paths, output_path, volume=1.0):
     """
     try:
         # Load each audio file into an AudioSegment object
-        audio_segments = [AudioSegment.from_file(path) for path in audio_paths]
+        audio_segments = _load_segments(audio_paths)
         
-        # Adjust the volume of each audio segment if volume is specified
+        # Bring all segments to a common frame rate, channel count and sample width
+        audio_segments = AudioSegment._sync(*audio_segments)
+        dtype = _SAMPLE_DTYPES[audio_segments[0].sample_width]
+
+        # Overlay all segments by summing their samples in a wide accumulator, padding shorter segments with silence
+        samples = [np.frombuffer(segment.raw_data, dtype=dtype) for segment in audio_segments]
+        accumulator = np.zeros(max(len(segment_samples) for segment_samples in samples), dtype=np.int64)
+        for segment_samples in samples:
+            accumulator[:len(segment_samples)] += segment_samples
+
+        # Adjust the volume of the whole mix with a single multiply if volume is specified
         if volume != 1.0:
-            audio_segments = [segment.set_volume(volume) for segment in audio_segments]
-        
-        # Mix all audio segments into a single AudioSegment object
-        mixed_audio = sum(audio_segments)
+            accumulator = np.rint(accumulator * volume)
+
+        # Clip back to the sample range and wrap the result in a single AudioSegment object
+        limits = np.iinfo(dtype)
+        mixed = np.clip(accumulator, limits.min, limits.max).astype(dtype)
+        mixed_audio = audio_segments[0]._spawn(data=mixed.tobytes())
         
         # Export the mixed audio to the specified output path
         mixed_audio.export(output_path, format="wav")
@@ -220,25 +477,8 @@ def mix_two(audio_path1, audio_path2, output_path, volume=1.0):
     - FileNotFoundError: If any of the audio files do not exist at the specified paths.
     - Exception: If an error occurs while reading the audio files or mixing them.
     """
-    try:
-        # Load each audio file into an AudioSegment object
-        audio_segment1 = AudioSegment.from_file(audio_path1)
-        audio_segment2 = AudioSegment.from_file(audio_path2)
-        
-        # Adjust the volume of each audio segment if volume is specified
-        if volume != 1.0:
-            audio_segment1 = audio_segment1.set_volume(volume)
-            audio_segment2 = audio_segment2.set_volume(volume)
-        
-        # Mix the two audio segments into a single AudioSegment object
-        mixed_audio = audio_segment1 + audio_segment2
-        
-        # Export the mixed audio to the specified output path
-        mixed_audio.export(output_path, format="wav")
-    except FileNotFoundError as e:
-        raise FileNotFoundError(f"One or more audio files do not exist at the specified paths: {e}")
-    except Exception as e:
-        raise Exception(f"An error occurred while reading the audio files or mixing them: {e}")
+    # Mix both files with the same vectorized path used for any number of files
+    mix([audio_path1, audio_path2], output_path, volume=volume)
 
 
 def convert_mp3_to_wav(mp3_path, wav_output_path):
@@ -257,13 +497,76 @@ def convert_mp3_to_wav(mp3_path, wav_output_path):
     - Exception: If an error occurs while reading the MP3 file or converting it to WAV.
     """
     try:
-        # Load the MP3 audio file into an AudioSegment object
-        audio_segment = AudioSegment.from_file(mp3_path)
-        
-        # Export the audio segment to WAV format
-        audio_segment.export(wav_output_path, format="wav")
+        # Check the input up front, as ffmpeg only reports a generic failure
+        if not os.path.isfile(mp3_path):
+            raise FileNotFoundError(mp3_path)
+
+        # Decode the MP3 straight to a WAV file with ffmpeg, without an intermediate AudioSegment
+        _run_ffmpeg('-i', mp3_path, '-f', 'wav', wav_output_path)
     except FileNotFoundError as e:
         raise FileNotFoundError(f"The MP3 file at {mp3_path} does not exist: {e}")
     except Exception as e:
         raise Exception(f"An error occurred while converting the MP3 file to WAV: {e}")
 
+
+async def _run_many(func, jobs, max_workers=None):
+    """
+    Run a blocking audio function over many argument tuples concurrently in a thread pool.
+
+    Parameters:
+    - func (callable): The audio function to run, e.g. trim or fade.
+    - jobs (iterable of tuple): The positional arguments for each call of func.
+    - max_workers (int, optional): The maximum number of calls running at the same time. Default is the ThreadPoolExecutor default.
+
+    Returns:
+    - list: The return values of each call, in the same order as jobs.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers)
+    try:
+        return await asyncio.gather(*[loop.run_in_executor(executor, func, *args) for args in jobs])
+    finally:
+        # After a failure, drop the queued jobs and let only the running ones finish, without blocking the event loop
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def trim_many(jobs, max_workers=None):
+    """
+    Trim many audio files concurrently.
+
+    Parameters:
+    - jobs (iterable of tuple): The positional arguments of trim for each file, e.g. (audio_path, output_path, trim_length).
+    - max_workers (int, optional): The maximum number of files processed at the same time. Default is the ThreadPoolExecutor default.
+
+    Returns:
+    - None: Each trimmed audio is saved to its output path.
+    """
+    await _run_many(trim, jobs, max_workers)
+
+
+async def fade_many(jobs, max_workers=None):
+    """
+    Add fade-in and fade-out effects to many audio files concurrently.
+
+    Parameters:
+    - jobs (iterable of tuple): The positional arguments of fade for each file, e.g. (audio_path, output_path, fade_in_duration, fade_out_duration).
+    - max_workers (int, optional): The maximum number of files processed at the same time. Default is the ThreadPoolExecutor default.
+
+    Returns:
+    - None: Each audio file with fade effects is saved to its output path.
+    """
+    await _run_many(fade, jobs, max_workers)
+
+
+async def mix_many(jobs, max_workers=None):
+    """
+    Mix many groups of audio files concurrently.
+
+    Parameters:
+    - jobs (iterable of tuple): The positional arguments of mix for each group, e.g. (audio_paths, output_path, volume).
+    - max_workers (int, optional): The maximum number of groups processed at the same time. Default is the ThreadPoolExecutor default.
+
+    Returns:
+    - None: Each mixed audio is saved to its output path.
+    """
+    await _run_many(mix, jobs, max_workers)
@@ -21,9 +21,12 @@
 # SOFTWARE.
 
 
-from msclap import CLAP
+import torch
 
-def audio_caption(audio_file_path, resample=True, beam_size=5, entry_length=67, temperature=0.01):
+from soundhub.models import autocast, get_clapcap, resolve_device
+
+
+def audio_caption(audio_file_path, resample=True, beam_size=5, entry_length=67, temperature=0.01, device=None, mixed_precision=False, fast=False):
     """
     Generate a caption for an audio file.
 
@@ -33,15 +36,24 @@ def audio_caption(audio_file_path, resample=True, beam_size=5, entry_length=67,
     beam_size (int): The beam size for beam search. Default is 5.
     entry_length (int): The maximum length of the caption. Default is 67.
     temperature (float): The temperature for sampling. Default is 0.01.
+    device (str, optional): The device to run the model on. Default is CUDA when available, otherwise CPU. CUDA devices other than the current one are not supported.
+    mixed_precision (bool): Whether to run the model in float16 on CUDA or bfloat16 on CPU. Default is False.
+    fast (bool): Whether to decode greedily (beam size 1) instead of using beam search. This cuts decoder work by roughly the beam size at a small cost in caption quality. Default is False.
 
     Returns:
     str: The generated caption text for the audio file.
     """
-    # Load the msclap model
-    clap_model = CLAP(version='clapcap', use_cuda=False)
+    # Greedy decoding trades a little caption quality for lower latency
+    if fast:
+        beam_size = 1
+
+    # Load the msclap model (shared and cached after the first call)
+    device = resolve_device(device)
+    clap_model = get_clapcap(device)
 
-    # Generate caption
-    captions = clap_model.generate_caption([audio_file_path], resample=resample, beam_size=beam_size, entry_length=entry_length, temperature=temperature)
+    # Generate caption without autograd bookkeeping
+    with torch.inference_mode(), autocast(device, mixed_precision):
+        captions = clap_model.generate_caption([audio_file_path], resample=resample, beam_size=beam_size, entry_length=entry_length, temperature=temperature)
 
     # If the return is a list, take the first element as the caption
     caption = captions[0] if isinstance(captions, list) else captions.get('caption', '')
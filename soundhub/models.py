@@ -0,0 +1,148 @@
+# MIT License
+
+# Copyright (c) 2024 Yuan-Man
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from functools import lru_cache
+import gc
+
+import torch
+from msclap import CLAP
+
+
+@lru_cache(maxsize=None)
+def get_clap(version, use_cuda):
+    """
+    Load a CLAP model once and share it across the whole process.
+
+    Parameters:
+    version (str): The msclap model version to load, e.g. '2022', '2023' or 'clapcap'.
+    use_cuda (bool): Whether to load the model on the GPU.
+
+    Returns:
+    CLAP: The cached CLAP model instance.
+    """
+    return CLAP(version=version, use_cuda=use_cuda)
+
+
+def resolve_device(device=None):
+    """
+    Resolve the device a CLAP model should run on.
+
+    Parameters:
+    device (str, optional): The requested device, e.g. "cuda", "cuda:0" or "cpu". If None, CUDA is used when available.
+
+    Returns:
+    torch.device: The resolved device, with the current CUDA device normalized to "cuda".
+
+    Raises:
+    ValueError: If a CUDA device other than the current one is requested. msclap always loads models on the current CUDA device.
+    """
+    if device is None:
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    device = torch.device(device)
+    if device.type == 'cuda' and device.index is not None:
+        if device.index != torch.cuda.current_device():
+            raise ValueError(f"Only the current CUDA device is supported, got {device}. Select the GPU with CUDA_VISIBLE_DEVICES or torch.cuda.set_device.")
+        device = torch.device('cuda')
+    return device
+
+
+def autocast_dtype(device):
+    """
+    Get the reduced-precision dtype used for CLAP inference on the given device.
+
+    Parameters:
+    device (torch.device): The device the model runs on.
+
+    Returns:
+    torch.dtype: float16 on CUDA, bfloat16 otherwise.
+    """
+    return torch.float16 if device.type == 'cuda' else torch.bfloat16
+
+
+def autocast(device, enabled):
+    """
+    Create an autocast context for CLAP inference on the given device.
+
+    Parameters:
+    device (torch.device): The device the model runs on.
+    enabled (bool): Whether to run in reduced precision, float16 on CUDA and bfloat16 on CPU.
+
+    Returns:
+    torch.autocast: The autocast context manager.
+    """
+    return torch.autocast(device_type=device.type, dtype=autocast_dtype(device), enabled=enabled)
+
+
+def get_clapcap(device=None):
+    """
+    Get the shared CLAP captioning model.
+
+    Parameters:
+    device (str, optional): The device to run the model on. Default is CUDA when available, otherwise CPU. CUDA devices other than the current one are not supported.
+
+    Returns:
+    CLAP: The cached 'clapcap' model instance.
+    """
+    return get_clap('clapcap', resolve_device(device).type == 'cuda')
+
+
+def get_clap2023(device=None):
+    """
+    Get the shared CLAP 2023 retrieval model.
+
+    Parameters:
+    device (str, optional): The device to run the model on. Default is CUDA when available, otherwise CPU. CUDA devices other than the current one are not supported.
+
+    Returns:
+    CLAP: The cached '2023' model instance.
+    """
+    return get_clap('2023', resolve_device(device).type == 'cuda')
+
+
+def preload(device=None):
+    """
+    Load the captioning and retrieval models ahead of the first call that needs them.
+
+    Parameters:
+    device (str, optional): The device to run the models on. Default is CUDA when available, otherwise CPU. CUDA devices other than the current one are not supported.
+
+    Returns:
+    None
+    """
+    get_clapcap(device)
+    get_clap2023(device)
+
+
+def unload():
+    """
+    Drop all cached CLAP models and release the memory they hold.
+
+    Models still referenced elsewhere are only freed once those references are gone.
+
+    Returns:
+    None
+    """
+    get_clap.cache_clear()
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
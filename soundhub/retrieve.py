@@ -21,10 +21,194 @@
 # SOFTWARE.
 
 
-from msclap import CLAP
+from functools import lru_cache
 import os
+import tempfile
+import threading
+import warnings
+import weakref
+import zipfile
 
-def retrieve_audio(query_text, audio_folder, top_n=5):
+import numpy as np
+import torch
+
+from soundhub.models import autocast, autocast_dtype, get_clap, resolve_device
+
+# Compiled audio encoders per shared CLAP model, and a lock guarding the temporary swap into the model
+_compiled_encoders = weakref.WeakKeyDictionary()
+_encoder_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def _text_embeddings(version, device, mixed_precision, query_text):
+    """
+    Compute the text embedding of a query once and reuse it across calls.
+
+    Parameters:
+    version (str): The msclap model version to use.
+    device (torch.device): The device the model runs on.
+    mixed_precision (bool): Whether to run the model in float16 on CUDA or bfloat16 on CPU.
+    query_text (str): The query text to embed.
+
+    Returns:
+    torch.Tensor: The (1, D) float32 text embedding, detached on the CPU so the cache does not hold device memory.
+    """
+    clap_model = get_clap(version, device.type == 'cuda')
+    with torch.inference_mode(), autocast(device, mixed_precision):
+        return clap_model.get_text_embeddings([query_text]).float().cpu()
+
+
+def _compiled_audio_encoder(clap_model):
+    """
+    Get a torch.compile'd copy of the audio encoder of a CLAP model, compiled once per model instance.
+
+    The compiled encoder is kept apart from the shared model, so only calls that ask for it use it.
+
+    Parameters:
+    clap_model (CLAP): The CLAP model whose audio encoder is compiled.
+
+    Returns:
+    torch.nn.Module: The compiled audio encoder, or None if torch.compile is unavailable or failed before.
+    """
+    if clap_model not in _compiled_encoders:
+        try:
+            _compiled_encoders[clap_model] = torch.compile(clap_model.clap.audio_encoder, mode='reduce-overhead', fullgraph=False)
+        except (AttributeError, RuntimeError):
+            # torch.compile is not available in this PyTorch build, use the eager encoder
+            _compiled_encoders[clap_model] = None
+    return _compiled_encoders[clap_model]
+
+
+def _is_compile_error(error):
+    """
+    Check whether an exception was raised by the torch.compile stack rather than by the model or its inputs.
+
+    Parameters:
+    error (Exception): The exception to check.
+
+    Returns:
+    bool: True if the exception comes from TorchDynamo or TorchInductor.
+    """
+    compile_errors = []
+    try:
+        from torch._dynamo.exc import TorchDynamoException
+        compile_errors.append(TorchDynamoException)
+    except ImportError:
+        pass
+    try:
+        from torch._inductor.exc import InductorError
+        compile_errors.append(InductorError)
+    except ImportError:
+        pass
+    return isinstance(error, tuple(compile_errors))
+
+
+def _get_audio_embeddings(clap_model, audio_files, compile_model=False):
+    """
+    Extract audio embeddings, optionally with a compiled audio encoder.
+
+    torch.compile only compiles on the first forward pass, so backend failures (e.g. no C compiler) surface here. In that case the eager encoder is used from then on.
+
+    Parameters:
+    clap_model (CLAP): The CLAP model used to extract the embeddings.
+    audio_files (list of str): The paths to the audio files.
+    compile_model (bool): Whether to run the compiled audio encoder.
+
+    Returns:
+    torch.Tensor: The (N, D) audio embeddings.
+    """
+    compiled_encoder = _compiled_audio_encoder(clap_model) if compile_model else None
+    if compiled_encoder is None:
+        return clap_model.get_audio_embeddings(audio_files)
+
+    # Swap the compiled encoder in for this call only and restore the eager one afterwards
+    with _encoder_lock:
+        eager_encoder = clap_model.clap.audio_encoder
+        clap_model.clap.audio_encoder = compiled_encoder
+        try:
+            return clap_model.get_audio_embeddings(audio_files)
+        except Exception as e:
+            if not _is_compile_error(e):
+                raise
+            _compiled_encoders[clap_model] = None
+            warnings.warn(f"torch.compile failed, falling back to the eager audio encoder: {e}")
+        finally:
+            clap_model.clap.audio_encoder = eager_encoder
+
+    return clap_model.get_audio_embeddings(audio_files)
+
+
+def _index_path(audio_folder, version, device, mixed_precision):
+    """
+    Get the path of the embedding index cached inside an audio folder.
+
+    Embeddings computed in reduced precision get their own index, so full-precision queries never rank with them.
+
+    Parameters:
+    audio_folder (str): The path to the folder containing audio files.
+    version (str): The msclap model version the embeddings were computed with.
+    device (torch.device): The device the embeddings were computed on.
+    mixed_precision (bool): Whether the embeddings were computed in reduced precision.
+
+    Returns:
+    str: The path of the cached embedding index.
+    """
+    precision = f'_{str(autocast_dtype(device)).replace("torch.", "")}' if mixed_precision else ''
+    return os.path.join(audio_folder, f'.clap_index_{version}{precision}.npz')
+
+
+def _load_index(index_path):
+    """
+    Load a cached embedding index.
+
+    Parameters:
+    index_path (str): The path of the cached embedding index.
+
+    Returns:
+    dict: A mapping from audio file name to its (mtime, embedding) pair, empty if no usable index exists.
+    """
+    try:
+        with np.load(index_path, allow_pickle=False) as index:
+            return {
+                name: (mtime, embedding)
+                for name, mtime, embedding in zip(index['names'].tolist(), index['mtimes'].tolist(), index['embeddings'])
+            }
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        # A missing, truncated or corrupt index is treated as empty and rebuilt
+        return {}
+
+
+def _save_index(index_path, names, mtimes, embeddings):
+    """
+    Save an embedding index, silently skipping folders that are not writable.
+
+    The index is written to a temporary file in the same folder and then moved into place, so readers never see a partially written index.
+
+    Parameters:
+    index_path (str): The path of the cached embedding index.
+    names (list of str): The audio file names.
+    mtimes (list of int): The modification times of the audio files, in nanoseconds.
+    embeddings (numpy.ndarray): The (N, D) audio embeddings, in the same order as names.
+
+    Returns:
+    None
+    """
+    temp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(index_path), suffix='.npz', delete=False) as temp_file:
+            temp_path = temp_file.name
+            np.savez(temp_file, names=np.array(names), mtimes=np.array(mtimes, dtype=np.int64), embeddings=embeddings)
+        os.replace(temp_path, index_path)
+    except OSError:
+        # Leave no temporary file behind if the index could not be written
+        if temp_path is not None:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def retrieve_audio(query_text, audio_folder, top_n=5, version='2023', batch_size=32, device=None, use_cache=True, compile_model=False, mixed_precision=False):
     """
     Retrieves the top_n audio files most similar to the query text.
 
@@ -32,32 +216,71 @@ def retrieve_audio(query_text, audio_folder, top_n=5):
     query_text (str): The query text to compare against.
     audio_folder (str): The path to the folder containing audio files.
     top_n (int): The number of top similar audio files to retrieve, default is 5.
+    version (str): The msclap model version used for retrieval, '2022' or '2023', default is '2023'. The 2023 model gives more accurate retrieval; the 2022 model encodes a shorter 5 second window per clip, which is cheaper for latency-critical use.
+    batch_size (int): The number of audio files encoded per forward pass, default is 32.
+    device (str, optional): The device to run the model on, default is CUDA when available, otherwise CPU. CUDA devices other than the current one are not supported.
+    use_cache (bool): Whether to reuse audio embeddings cached in the folder, default is True. Only new or modified files are re-encoded.
+    compile_model (bool): Whether to run a torch.compile'd audio encoder for this call, default is False. The first such query is slower while the encoder compiles, and the eager encoder is used if compilation fails.
+    mixed_precision (bool): Whether to run the model in float16 on CUDA or bfloat16 on CPU, default is False.
 
     Returns:
     list: A list of the top_n most similar audio file names.
+
+    Raises:
+    ValueError: If version is not a supported retrieval model.
     """
-    # Load the CLAP model
-    clap_model = CLAP(version='2023', use_cuda=False)
+    if version not in ('2022', '2023'):
+        raise ValueError(f"Unsupported CLAP version for retrieval: {version}. Expected '2022' or '2023'.")
+
+    # Load the CLAP model (shared and cached after the first call)
+    device = resolve_device(device)
+    clap_model = get_clap(version, device.type == 'cuda')
+
+    # Get a sorted list of audio files in a single directory scan
+    with os.scandir(audio_folder) as entries:
+        audio_entries = sorted(
+            (entry for entry in entries if entry.name.endswith('.wav') and entry.is_file()),
+            key=lambda entry: entry.name,
+        )
+    if not audio_entries:
+        return []
+    audio_files = [entry.path for entry in audio_entries]
+
+    # Look up cached embeddings and find the files that are new or modified since they were cached
+    names = [entry.name for entry in audio_entries]
+    mtimes = [entry.stat().st_mtime_ns for entry in audio_entries]
+    index_path = _index_path(audio_folder, version, device, mixed_precision)
+    index = _load_index(index_path) if use_cache else {}
+    stale = [i for i, (name, mtime) in enumerate(zip(names, mtimes)) if name not in index or index[name][0] != mtime]
+
+    # msclap places the model itself, so move tensors to where its weights actually are
+    model_device = clap_model.clap.logit_scale.device
 
-    # Get a list of audio file paths
-    audio_files = [os.path.join(audio_folder, f) for f in os.listdir(audio_folder) if f.endswith('.wav')]
+    with torch.inference_mode():
+        with autocast(device, mixed_precision):
+            # Extract embeddings for the query text (cached per query)
+            text_embeddings = _text_embeddings(version, device, mixed_precision, query_text).to(model_device)
 
-    # Extract embeddings for the query text
-    text_embeddings = clap_model.get_text_embeddings([query_text])
+            # Extract audio embeddings for the stale files in batches
+            for start in range(0, len(stale), batch_size):
+                batch = stale[start:start + batch_size]
+                embeddings = _get_audio_embeddings(clap_model, [audio_files[i] for i in batch], compile_model).float().cpu().numpy()
+                for i, embedding in zip(batch, embeddings):
+                    index[names[i]] = (mtimes[i], embedding)
 
-    # Initialize a list to store similarities
-    similarities = []
+        # Stack the cached and new embeddings into a single (N, D) array and persist it
+        audio_embeddings = np.stack([index[name][1] for name in names])
+        if use_cache and (stale or len(index) != len(names)):
+            _save_index(index_path, names, mtimes, audio_embeddings)
+        audio_embeddings = torch.from_numpy(audio_embeddings).to(model_device)
 
-    # Calculate similarity for each audio file
-    for audio_file in audio_files:
-        audio_embeddings = clap_model.get_audio_embeddings([audio_file])
-        similarity = clap_model.compute_similarity(audio_embeddings, text_embeddings)
-        similarities.append((audio_file, similarity))
+        # Calculate the similarity of every audio file in a single matmul
+        similarities = clap_model.compute_similarity(audio_embeddings, text_embeddings).squeeze(-1)
 
-    # Sort the audio files by similarity in descending order
-    similarities.sort(key=lambda x: x[1], reverse=True)
+        # Select the top_n most similar audio files, in descending order of similarity
+        _, indices = torch.topk(similarities, k=min(top_n, similarities.numel()))
 
     # Get the top_n most similar audio files
-    top_similar_audio_files = [audio_file for audio_file, _ in similarities[:top_n]]
+    top_similar_audio_files = [audio_files[i] for i in indices.tolist()]
 
     return top_similar_audio_files
@@ -0,0 +1,71 @@
+# MIT License
+
+# Copyright (c) 2024 Yuan-Man
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+import shutil
+import wave
+
+import pytest
+
+audio = pytest.importorskip('soundhub.audio')
+
+requires_ffprobe = pytest.mark.skipif(shutil.which('ffprobe') is None, reason='ffprobe is not installed')
+
+
+def _write_wav(path, frames, sample_width=1, channels=1, frame_rate=8000):
+    with wave.open(str(path), 'wb') as wave_file:
+        wave_file.setnchannels(channels)
+        wave_file.setsampwidth(sample_width)
+        wave_file.setframerate(frame_rate)
+        wave_file.writeframes(frames)
+
+
+def _read_wav(path):
+    with wave.open(str(path), 'rb') as wave_file:
+        return wave_file.getparams(), wave_file.readframes(wave_file.getnframes())
+
+
+@requires_ffprobe
+def test_concat_keeps_8bit_samples_unsigned(tmp_path):
+    ramp = bytes([0, 1, 2, 3, 4])
+    _write_wav(tmp_path / 'a.wav', ramp)
+    _write_wav(tmp_path / 'b.wav', ramp)
+
+    audio.concat([str(tmp_path / 'a.wav'), str(tmp_path / 'b.wav')], str(tmp_path / 'out.wav'))
+
+    params, frames = _read_wav(tmp_path / 'out.wav')
+    assert params.sampwidth == 1
+    assert frames == ramp + ramp
+
+
+@requires_ffprobe
+def test_concat_converts_up_to_the_highest_format(tmp_path):
+    _write_wav(tmp_path / 'low.wav', bytes(800), sample_width=1, channels=1, frame_rate=8000)
+    _write_wav(tmp_path / 'high.wav', bytes(6400), sample_width=2, channels=2, frame_rate=16000)
+
+    audio.concat([str(tmp_path / 'low.wav'), str(tmp_path / 'high.wav')], str(tmp_path / 'out.wav'))
+
+    params, _ = _read_wav(tmp_path / 'out.wav')
+    assert (params.framerate, params.nchannels, params.sampwidth) == (16000, 2, 2)
+    # 0.1s at 16 kHz from each input, allowing for resampler rounding
+    assert abs(params.nframes - 3200) <= 1